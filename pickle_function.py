@@ -2,9 +2,11 @@
 # Tested in Python 3.9.  This uses a lot of internals, so it may break in
 # earlier or later versions!
 import _collections_abc
+import functools
 import importlib
 import importlib.machinery
 import io
+import operator
 import pickle
 import sys
 import types
@@ -13,9 +15,6 @@ import types
 # known-ish TODO:
 # - modules
 #   - do we need to handle __loader__, __package__, __spec__?
-# - can we simpplify our control flow re save_global etc. as a
-#   reducer_override?
-#   https://docs.python.org/3/library/pickle.html#custom-reduction-for-types-functions-and-other-objects
 # - fuzz-test by pickling real modules/functions/etc.
 # - blog post:
 #   - intro/problem-statement
@@ -49,7 +48,8 @@ _CODE_ARGS = (
     'co_freevars',
     'co_cellvars')
 
-# Arguments (in order) to the types.FunctionType constructor.
+# Arguments (in order) to the types.FunctionType constructor.  (Pickler reads
+# these directly, so if you change this, change reduce_function too.)
 _FUNC_ARGS = (
     '__code__',
     '__globals__',
@@ -60,7 +60,7 @@ _FUNC_ARGS = (
 
 # Interesting attributes of types.FunctionType that aren't arguments to the
 # constructor (they are mutable and we copy them separately).
-_FUNC_ATTRS = {
+_FUNC_ATTRS = (
     '__annotations__',
     '__dict__',
     '__kwdefaults__',
@@ -73,10 +73,18 @@ _FUNC_ATTRS = {
     # easier to just explicitly pickle it than to worry about all that.
     # [1] https://github.com/python/cpython/blob/cbfa09b70b745c9d7393c03955600f6d1cf019e3/Objects/funcobject.c#L56    # noqa:L501
     '__doc__',
+)
+
+# The values the FunctionType constructor gives some of _FUNC_ATTRS.  (It also
+# sets __qualname__ to __code__.co_name -- not to the name it's passed!)
+_FUNC_ATTR_DEFAULTS = {
+    '__annotations__': {},
+    '__dict__': {},
+    '__kwdefaults__': None,
 }
 
 # Like _FUNC_ATTRS, but for types.
-_TYPE_ATTRS = {
+_TYPE_ATTRS = (
     '__qualname__',
     # Attributes you might think we need (e.g. from
     # pickle_util.interesting_attrs) that we don't:
@@ -97,7 +105,29 @@ _TYPE_ATTRS = {
     # '__bases__',
     # '__dict__',
     # '__name__',
-}
+)
+
+
+# Keys of a type's __dict__ we don't pickle.  __dict__ and __weakref__ are a
+# bit special (they're getset_descriptor objects), and will get initialized
+# just fine automagically, so omit them to avoid infinite recursion or other
+# strange nonsense.  God knows what's happening with _abc_impl, I've never
+# understood the implementation of abc.
+_EXCLUDED_TYPE_DICT_KEYS = frozenset({'__dict__', '__weakref__', '_abc_impl'})
+
+
+def _getter(attr_names):
+    """Like operator.attrgetter(*attr_names), but always returns a tuple."""
+    if not attr_names:
+        return lambda obj: ()
+    getter = operator.attrgetter(*attr_names)
+    if len(attr_names) == 1:
+        return lambda obj: (getter(obj),)
+    return getter
+
+
+_get_func_attrs = _getter(_FUNC_ATTRS)
+_get_type_attrs = _getter(_TYPE_ATTRS)
 
 
 _TRUE_NAMES = {
@@ -115,13 +145,39 @@ _TRUE_NAMES = {
 }
 
 
-_TYPE_TO_TRUE_NAME = {}
-for name in _TRUE_NAMES:
-    module_name, symbol_name = name.rsplit('.', 1)
-    module = importlib.import_module(module_name)
-    symbol = getattr(module, symbol_name)
-    if isinstance(symbol, type):
-        _TYPE_TO_TRUE_NAME[symbol] = name
+@functools.lru_cache(maxsize=None)
+def _type_to_true_name():
+    """Returns a map from each type in _TRUE_NAMES to its name.
+
+    We build this on first use, rather than at import time, since it requires
+    importing all the modules in _TRUE_NAMES.
+    """
+    type_to_true_name = {}
+    for name in _TRUE_NAMES:
+        module_name, symbol_name = name.rsplit('.', 1)
+        module = importlib.import_module(module_name)
+        symbol = getattr(module, symbol_name)
+        if isinstance(symbol, type):
+            type_to_true_name[symbol] = name
+    return type_to_true_name
+
+
+# Modules whose types _type_is_C always treats as C types.
+_C_MODULES = frozenset({
+    # Don't try to get smart with builtins:
+    'builtins',
+    # Nor quasi-builtins:
+    '_frozen_importlib', 'importlib.abc', '_sitebuiltins', 'types',
+    # Contain some builtins, and very system-specific anyway:
+    'os', 'sys', 'signal',
+    # TODO: figure out how to pickle weakrefs; until such time treat them as
+    # builtins.
+    'weakref', 'unittest.main', 'unittest.signals',
+    # TODO: figure out how to pickle typing.Gneric.__class_getitem__
+    'typing',
+})
+
+_EXTENSION_SUFFIXES = tuple(importlib.machinery.EXTENSION_SUFFIXES)
 
 
 def _type_is_C(cls):
@@ -138,19 +194,7 @@ def _type_is_C(cls):
         https://stackoverflow.com/a/60953150
     """
     modulename = cls.__module__
-    if modulename in (
-            # Don't try to get smart with builtins:
-            'builtins',
-            # Nor quasi-builtins:
-            '_frozen_importlib', 'importlib.abc', '_sitebuiltins', 'types',
-            # Contain some builtins, and very system-specific anyway:
-            'os', 'sys', 'signal',
-            # TODO: figure out how to pickle weakrefs; until such time treat
-            # them as builtins.
-            'weakref', 'unittest.main', 'unittest.signals',
-            # TODO: figure out how to pickle typing.Gneric.__class_getitem__
-            'typing',
-    ):
+    if modulename in _C_MODULES:
         return True
 
     module = sys.modules.get(modulename)
@@ -174,12 +218,74 @@ def _type_is_C(cls):
     filename = getattr(module, '__file__', None)
     if filename is None:
         return True
-    return filename.endswith(tuple(importlib.machinery.EXTENSION_SUFFIXES))
+    return filename.endswith(_EXTENSION_SUFFIXES)
+
+
+class _Import:
+    """A placeholder which pickles as `__import__(name)`."""
+    def __init__(self, name):
+        self.name = name
+
+    def __reduce__(self):
+        return (__import__, (self.name,))
+
 
+@functools.lru_cache(maxsize=None)
+def _import(name):
+    """Returns the (shared) _Import for the given module."""
+    return _Import(name)
+
+
+@functools.lru_cache(maxsize=None)
+def _reduce_global(name):
+    """Returns a reduce-value for the global with the given name.
+
+    This is like returning the name from __reduce__, but it works for values
+    of type types.BuildinMethodType (i.e. anything defined in C) which don't
+    live where their __module__ says, such as types.FunctionType (whose
+    __module__ is builtins).  Those can't be saved as a STACK_GLOBAL, since
+    pickle checks that the name actually points back to the object, so we
+    save them as `getattr(__import__(module), name)` instead.
+
+    We cache the result, and share the _Import between all the names in a
+    given module, so that pickle's memo means we only save each once.
+    """
+    module, name = name.rsplit('.', 1)
+    return (getattr, (_import(module), name))
 
-class Pickler(pickle._Pickler):
+
+def _setattrs(d, defaults=None):
+    """Returns a reduce-state which sets all attrs in the dict d.
+
+    That is, the state does roughly `obj.__dict__.update(d)`, except it works
+    right for slots.  If defaults is given, it should map attrs to the values
+    the constructor already gives them; we remove any attrs that still have
+    those values from d (in place, to avoid building yet another dict).  If
+    that leaves nothing to set, we return None, so pickle doesn't bother with
+    a BUILD at all.
+    """
+    if defaults:
+        for k, default in defaults.items():
+            if k in d and default == d[k]:
+                del d[k]
+    if not d:
+        return None
+
+    # Normally, BUILD takes a dict, state, and does basically
+    #   obj.__dict__.update(state)
+    # But to handle __slots__, it also allows a pair (state, slotstate), and
+    # does setattrs for the elements of slotstate.  We just do that always
+    # because it's easier than figuring out which one is right.
+    return (None, d)
+
+
+class Pickler(pickle.Pickler):
     """A pickler that can save lambdas, inline functions, and other garbage.
 
+    We build on the C pickler, and hook in via reducer_override: for each
+    object we know how to handle, we return a __reduce__-style tuple
+    (constructor, args, state), and let the C pickler write the opcodes.
+
     GENERAL NOTE: Lots of the things we pickle can be recursive, which requires
     some care to handle.  In general, pickling an object looks like:
     0. check if the object is in the memo, and if so use that
@@ -251,7 +357,15 @@ class Pickler(pickle._Pickler):
     pickled f, build f with just the immutable attributes, add it to the memo,
     then pickle and set the mutable attributes.
 
-    See also the comments starting "Subtle." in stdlib's save_tuple.
+    Conveniently, this is exactly what pickle does with a reduce-value
+    (constructor, args, state): it does A for the args (after building the
+    object, it checks the memo again, and if the object is there, pops what it
+    built and uses that instead), and B for the state (which it saves only
+    after the object is in the memo).  So all we have to do is to put the
+    immutable attributes in args, and the mutable ones in state.
+
+    See also the comments starting "Subtle." in stdlib's save_tuple and
+    save_reduce.
     """
     def __init__(self, *args, **kwargs):
         super().__init__(*args, **kwargs)
@@ -265,260 +379,186 @@ class Pickler(pickle._Pickler):
         # would make for very large pickles, but would also make code that
         # looks at `globals()` work right.  Or, we could look at depickling in
         # caller's globals.  It's not clear to me which is more correct.
+        # (We key on the function itself, rather than its id, so that it
+        # can't be garbage-collected and its id reused while we're pickling.)
         self.function_globals = {}
 
-    def _save_global_name(self, name):
-        """Saves the global with the given name.
-
-        This is like save_global, but it works for values of type
-        types.BuildinMethodType (i.e. anything defined in C) which
-        don't live in __builtins__, such as types.FunctionType.
+    def clear_memo(self):
+        super().clear_memo()
+        # Once the globals-maps are out of the memo, there's no identity left
+        # to preserve, so forget them too.
+        self.function_globals.clear()
+
+    # Like pickle._Pickler.dispatch, but maps type -> reducer (a function
+    # which takes the pickler and the object, and returns a reduce-value).
+    dispatch = {}
+
+    def reducer_override(self, obj):
+        """Hooks our reducers into the C pickler.
+
+        The C pickler calls this for every object that's not one of the
+        basic builtins it handles itself (None, ints, strs, dicts, tuples,
+        etc.), before its own handling of functions and types.  We return
+        NotImplemented for anything we don't want to handle specially, which
+        makes pickle fall back to its usual behavior.
+
+        Note that types are not in dispatch, since that doesn't work for types
+        with (nontrivial) metaclasses: we'd end up looking for
+        `dispatch[<metaclass>]` which is of course not set.  So we check for
+        them separately.
         """
-        module, name = name.rsplit('.', 1)
-        self.save(module)
-        self.save(name)
-        self.write(pickle.STACK_GLOBAL)
-
-    def _setattrs(self, d):
-        """Set all attrs in the dict d on the object on top of the stack.
-
-        This writes opcodes roughly equivalent to `obj.__dict__.update(d)`,
-        except they work right for slots.
-        """
-        # Normally, BUILD takes a dict, state, and does basically
-        #   obj.__dict__.update(state)
-        # But to handle __slots__, it also allows a pair (state, slotstate),
-        # and does setattrs for the elements of slotstate.  We just do that
-        # always because it's easier than figuring out which one is right.
-        self.save((None, d))
-        self.write(pickle.BUILD)
-
-    dispatch = pickle._Pickler.dispatch.copy()
-
-    def _get_obj(self, obj):
-        """Write the opcodes to get obj from the memo."""
-        self.write(self.get(self.memo[id(obj)][0]))
-
-    def save_function(self, obj):
+        reducer = self.dispatch.get(type(obj))
+        if reducer is not None:
+            return reducer(self, obj)
+        elif isinstance(obj, type):
+            return self._reduce_type(obj)
+        return NotImplemented
+
+    def reduce_function(self, obj):
         """An "improved" version of save_global that can save functions.
 
-        Note that this has to hook directly into dispatch, rather than the
-        intended extension points like dispatch_table or copyreg, for two
-        reasons:
-        1. Pickle thinks it already knows how to handle FunctionType, and we
-           want to override that builtin handling.  (This does not apply to
-           CodeType.)
-        2. We need the internal semantics of save_foo (which writes opcodes
-           directly) rather than __reduce__-like semantics exposed by
-           dispatch_table (where we return a constructor and some arguments).
-           This is because pickle doesn't know how to pickle our constructor
-           (types.FunctionType): we need to use _save_global_name.  (This
-           applies equally to CodeType.)
-           TODO: could we avoid this limitation by special-casing the
-           constructor itself in save_global, and then handling the rest
-           normally?
+        Note that this has to hook into reducer_override, rather than the
+        intended extension points like dispatch_table or copyreg, because
+        pickle thinks it already knows how to handle FunctionType (namely as a
+        global), and we want to override that builtin handling.  (This does
+        not apply to CodeType.)
         """
         # TODO: flag to allow using the below, for e.g. stdlib functions we
         # can't pickle (will there be any????)
-        # try:
-        #     return self.save_global(obj)
-        # except Exception:
-        #     if type(obj) != types.FunctionType:   # noqa:E721
-        #         raise
-
-        memoed = self.memo.get(id(obj))
-        if memoed is not None:
-            self.write(self.get(memoed[0]))
-            return
-
-        # Figure out the args to the FunctionType constructor.
-        args = [getattr(obj, arg_name) for arg_name in _FUNC_ARGS]
+        # if type(obj) != types.FunctionType:   # noqa:E721
+        #     return NotImplemented
 
         # We specially handle the globals-dict.
-        co_names = set(obj.__code__.co_names)
-        globals_dict = self.function_globals.get(id(obj))
+        globals_dict = self.function_globals.get(obj)
         if globals_dict is None:
             # Only pickle globals we actually need, to save size and reduce the
             # chances that some weird object somewhere in the codebase crashes
-            # us.
+            # us.  (Intersecting with the keys-view does the lookups in C, and
+            # only over co_names, which is usually much smaller than the
+            # globals.)
             # TODO: revisit once we can pickle modules and such.
-            globals_dict = {k: v for k, v in obj.__globals__.items()
-                            if k in co_names
-                            # co_names can also refer to a name from
-                            # __builtins__, which is the builtins module's
-                            # dict, so we need to save that too.  Luckily even
-                            # normal-pickle knows how to pickle everything
-                            # that's normally there, so we don't bother to
-                            # filter.
-                            # But if we are in __main__, __builtins__ is the
-                            # actual module, not its dict [1], in which case we
-                            # don't want to do that (although maybe we can once
-                            # we know how to pickle modules).
-                            # [1] https://docs.python.org/3/reference/executionmodel.html#builtins-and-restricted-execution   # noqa:L501
-                            or k == '__builtins__' and isinstance(v, dict)}
-            self.function_globals[id(obj)] = globals_dict
-        args[_FUNC_ARGS.index('__globals__')] = globals_dict
-
-        # Save the function!
-        self._save_global_name('types.FunctionType')
-        self.save(tuple(args))
-        # Handle recursive functions (we can have self-references via
-        # __globals__, __closure__, or via the items of __defaults__).
-        # See class docstring for more.
-        memoed = self.memo.get(id(obj))
-        if memoed is not None:
-            self.write(pickle.POP + self.get(memoed[0]))
-            return
-
-        # Now build the function itself.
-        self.write(pickle.REDUCE)
-        self.memoize(obj)
-
-        # Fix up mutable args that aren't in the constructor.
-        self._setattrs({k: getattr(obj, k) for k in _FUNC_ATTRS})
-
-    dispatch[types.FunctionType] = save_function
-
-    def save_global(self, obj, name=None):
-        """Wires up save_type.
-
-        You might expect that we would wire up save_type like upstream does,
-        and like we do for save_function, namely:
-            dispatch[type] = save_type
-        But this doesn't work for types with (nontrivial) metaclasses: we'd end
-        up looking for `dispatch[<metaclass>]` which is of course not set.
-        Luckily, upstream already checks for this case in save(), and calls
-        directly to save_global for objects whose type isn't in dispatch but
-        inherits from type.  We want to apply our usual nonsense to that call,
-        so we override save_global to do that.
-        """
-        cls = type(obj)
-        if name is not None:
-            # __reduce__ can return a string, which means, "save me as this
-            # global name"; respect that by delegating to upstream.
-            super().save_global(obj, name)
-        elif issubclass(cls, type):
-            # TODO: flag to try/except this for all types:
-            if _type_is_C(obj):
-                name = _TYPE_TO_TRUE_NAME.get(obj)
-                if name is not None:
-                    return self._save_global_name(name)
-                # C types we give up and save as globals.  (I mean, we could
-                # try to serialize the .so, but, even more yikes.)
-                return super().save_global(obj)
-            # Else, do our magic.
-            self._save_type(obj)
-        else:
-            # (Should never happen, unless upstream changed.)
-            raise pickle.PicklingError(
-                "Unexpected type passed to save_global: %s" % cls)
-
-    def _save_type(self, cls):
-        """Saves a user-defined type.
-
-        This is generally like save_function.  We don't bother wiring it in as
-        dispatch[type] because upstream's save_type basically just calls
-        save_global, which we need to override to call us anyway.
+            g = obj.__globals__
+            co_names = frozenset(obj.__code__.co_names)
+            globals_dict = {k: g[k] for k in co_names & g.keys()}
+            # co_names can also refer to a name from __builtins__, which is the
+            # builtins module's dict, so we need to save that too.  Luckily
+            # even normal-pickle knows how to pickle everything that's normally
+            # there, so we don't bother to filter.
+            # But if we are in __main__, __builtins__ is the actual module, not
+            # its dict [1], in which case we don't want to do that (although
+            # maybe we can once we know how to pickle modules).
+            # [1] https://docs.python.org/3/reference/executionmodel.html#builtins-and-restricted-execution   # noqa:L501
+            builtins_dict = g.get('__builtins__')
+            if isinstance(builtins_dict, dict):
+                globals_dict['__builtins__'] = builtins_dict
+            self.function_globals[obj] = globals_dict
+
+        # The args to the FunctionType constructor (see _FUNC_ARGS), with our
+        # globals-dict in place of __globals__.
+        args = (obj.__code__, globals_dict, obj.__name__, obj.__defaults__,
+                obj.__closure__)
+
+        # Save the function!  (Recursive functions, which can have
+        # self-references via __globals__, __closure__, or via the items of
+        # __defaults__, are handled by pickle; see class docstring for more.)
+        # Then fix up mutable args that aren't in the constructor.
+        # (We skip any the constructor will already have set right.)
+        attrs = dict(zip(_FUNC_ATTRS, _get_func_attrs(obj)))
+        if attrs['__qualname__'] == obj.__code__.co_name:
+            del attrs['__qualname__']
+        return (types.FunctionType, args,
+                _setattrs(attrs, _FUNC_ATTR_DEFAULTS))
+
+    dispatch[types.FunctionType] = reduce_function
+
+    def _reduce_type(self, cls):
+        """Reduces a type.
+
+        This is generally like reduce_function, except that types defined in
+        C, we just save as globals.
         """
-        memoed = self.memo.get(id(cls))
-        if memoed is not None:
-            self.write(self.get(memoed[0]))
-            return
+        # TODO: flag to try/except this for all types:
+        if _type_is_C(cls):
+            name = _type_to_true_name().get(cls)
+            if name is not None:
+                return _reduce_global(name)
+            # C types we give up and save as globals.  (I mean, we could try to
+            # serialize the .so, but, even more yikes.)
+            return NotImplemented
 
         slots = getattr(cls, '__slots__', ())
         # Apparently `__slots__ = "the_slot"` is legal???
         if isinstance(slots, str):
             slots = (slots,)
-        elif not isinstance(slots, tuple):  # an iterable, I hope
-            slots = tuple(slots)
+        excluded = _EXCLUDED_TYPE_DICT_KEYS.union(slots)
 
         # Else, we save the type as a call to type(name, bases, dict).  
         # The arguments to type() are simple: type(name, bases, dict).  We'll
         # fill in __dict__ specially below.
         args = (cls.__name__, cls.__bases__,
-                # __dict__ and __weakref__ are a bit special (they're
-                # getset_descriptor objects), and will get initialized just
-                # fine automagically, so omit them to avoid infinite recursion
-                # or other strange nonsense.  Similarly any attr in __slots__
-                # is a member_descriptor.  God knows what's happening with
-                # _abc_impl, I've never understood the implementation of abc.
-                {k: v for k, v in cls.__dict__.items()
-                 if k not in ('__dict__', '__weakref__', '_abc_impl') + slots})
-
-        # Now save the class, similar to functions.
-        if type(cls) is type:
-            # Normally the constructor is type.
-            self._save_global_name('builtins.type')
-        else:
-            # But if you have a metaclass, that's the constructor.
-            self._save_type(type(cls))
-        self.save(args)
-        # Handle recursive classes:
-        memoed = self.memo.get(id(cls))
-        if memoed is not None:
-            self.write(pickle.POP + self.get(memoed[0]))
-            return
-        self.write(pickle.REDUCE)
-        self.memoize(cls)
-        self._setattrs({k: getattr(cls, k) for k in _TYPE_ATTRS})
-
-    def _make_simple_saver(constructor_name, arg_names, attr_names):
-        """Returns a saver for a type which can be saved via REDUCE + BUILD.
+                # Any attr in __slots__ is a member_descriptor, which will
+                # get initialized just fine automagically, so omit them (as
+                # well as _EXCLUDED_TYPE_DICT_KEYS).
+                {k: v for k, v in cls.__dict__.items() if k not in excluded})
+
+        # Now save the class, similar to functions.  Normally the constructor
+        # is type, but if you have a metaclass, that's the constructor.
+        # (Like for functions, type() sets __qualname__ to __name__.)
+        attrs = dict(zip(_TYPE_ATTRS, _get_type_attrs(cls)))
+        if attrs['__qualname__'] == cls.__name__:
+            del attrs['__qualname__']
+        return (type(cls), args, _setattrs(attrs))
+
+    def _make_simple_reducer(constructor, arg_names, attr_names):
+        """Returns a reducer for a type which can be saved via REDUCE + BUILD.
 
         In particular, this works for any type for which:
         - to construct the type, it suffices to call `constructor(*args)`,
-          then do some setattrs;
-        - the type's constructor is a global (whose name is given in
-          constructor_name); and
+          then do some setattrs; and
         - the constructor-arguments and attributes to be set are all attributes
           of the instance (whose names are given in arg_names and attr_names).
 
-        This ultimately works mostly like save_function, just without some of
-        the extra-complicated bits around globals.
+        This ultimately works mostly like reduce_function, just without some
+        of the extra-complicated bits around globals.
         """
-        def saver(self, obj):
-            memoed = self.memo.get(id(obj))
-            if memoed is not None:
-                self.write(self.get(memoed[0]))
-                return
-
-            if isinstance(obj, types.ModuleType) and obj.__name__ == 'sys':
-                self._save_global_name('builtins.__import__')
-                self.save((obj.__name__,))
-                self.write(pickle.REDUCE)
-                self.memoize(obj)
-                return
-
-            self._save_global_name(constructor_name)
-            self.save(tuple(getattr(obj, attr) for attr in arg_names))
-
-            # (This handles if obj is recursive; see class docstring.)
-            memoed = self.memo.get(id(obj))
-            if memoed is not None:
-                self.write(pickle.POP + self.get(memoed[0]))
-                return
-
-            self.write(pickle.REDUCE)
-            self.memoize(obj)
+        get_args = _getter(arg_names)
+        get_attrs = _getter(attr_names)
+
+        def reducer(self, obj):
+            args = get_args(obj)
             if attr_names:
-                self._setattrs({k: getattr(obj, k) for k in attr_names})
-
-        return saver
-
-    dispatch[types.CodeType] = _make_simple_saver(
-        'types.CodeType', _CODE_ARGS, ())
-    dispatch[types.CellType] = _make_simple_saver(
-        'types.CellType', (), ('cell_contents',))
-    dispatch[staticmethod] = _make_simple_saver(
-        'builtins.staticmethod', ('__func__',), ())
-    dispatch[classmethod] = _make_simple_saver(
-        'builtins.classmethod', ('__func__',), ())
-    dispatch[property] = _make_simple_saver(
-        'builtins.property', ('fget', 'fset', 'fdel', '__doc__'), ())
-    dispatch[types.ModuleType] = _make_simple_saver(
-        'types.ModuleType', ('__name__', '__doc__'),
+                return (constructor, args,
+                        _setattrs(dict(zip(attr_names, get_attrs(obj)))))
+            return (constructor, args)
+
+        return reducer
+
+    dispatch[types.CodeType] = _make_simple_reducer(
+        types.CodeType, _CODE_ARGS, ())
+    dispatch[types.CellType] = _make_simple_reducer(
+        types.CellType, (), ('cell_contents',))
+    dispatch[staticmethod] = _make_simple_reducer(
+        staticmethod, ('__func__',), ())
+    dispatch[classmethod] = _make_simple_reducer(
+        classmethod, ('__func__',), ())
+    dispatch[property] = _make_simple_reducer(
+        property, ('fget', 'fset', 'fdel', '__doc__'), ())
+    dispatch[types.ModuleType] = _make_simple_reducer(
+        types.ModuleType, ('__name__', '__doc__'),
         ('__dict__', '__loader__', '__package__', '__spec__'))
 
+    def reduce_module(self, obj, _reduce_module=dispatch[types.ModuleType]):
+        """Reduces a module, except sys, which we just import.
+
+        (We special-case sys here, rather than in the simple reducer, so that
+        the reducers for the much more common types don't pay for the check.)
+        """
+        if obj.__name__ == 'sys':
+            return (__import__, (obj.__name__,))
+        return _reduce_module(self, obj)
+
+    dispatch[types.ModuleType] = reduce_module
+
 
 def dumps(obj, protocol=None, *, fix_imports=True):
     assert protocol is None or protocol >= 2
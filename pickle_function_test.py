@@ -1,6 +1,5 @@
 # flake8: noqa  # we do lots of weird things to test them!
-import itertools
-import pickle
+import functools
 import re
 import unittest
 import types
@@ -10,47 +9,76 @@ import pickle_function
 import pickle_util
 
 
+# doc is only a class-attr here, no need to pickle.
+_EXPECTED_CODE_ATTRS = frozenset(pickle_function._CODE_ARGS) | {'__doc__'}
+_EXPECTED_FUNC_ATTRS = (frozenset(pickle_function._FUNC_ARGS)
+                        | frozenset(pickle_function._FUNC_ATTRS))
+
+
 class TestConsts(unittest.TestCase):
     def test_code_attrs(self):
         # We can't check that the order is correct (the constructor is in C so
         # we can't introspect it) but we can check that the set is correct.
-        self.assertEqual(
-            # doc is only a class-attr here, no need to pickle.
-            set(pickle_function._CODE_ARGS) | {'__doc__'},
-            pickle_util.interesting_attrs(types.CodeType))
+        self.assertEqual(_EXPECTED_CODE_ATTRS,
+                         pickle_util.interesting_attrs(types.CodeType))
 
     def test_func_attrs(self):
-        self.assertEqual(
-            set(pickle_function._FUNC_ARGS) | pickle_function._FUNC_ATTRS,
-            pickle_util.interesting_attrs(types.FunctionType))
+        self.assertEqual(_EXPECTED_FUNC_ATTRS,
+                         pickle_util.interesting_attrs(types.FunctionType))
+
+
+_ADDRESS_RE = re.compile(' at 0x[0-9a-f]+>$')
 
 
 def _repr_without_address(val):
-    return re.sub(' at 0x[0-9a-f]+>$', '>', repr(val))
+    return _ADDRESS_RE.sub('>', repr(val))
+
+
+def _shape(val):
+    """Returns a summary of val which should survive a roundtrip.
+
+    For things with a __qualname__ (functions and classes), that's the type,
+    module, qualname, and doc; for anything else we fall back to the repr.
+    """
+    qualname = getattr(val, '__qualname__', None)
+    if qualname is None:
+        return _repr_without_address(val)
+    return (type(val).__name__, getattr(val, '__module__', None), qualname,
+            val.__doc__)
 
 
 def _roundtrip_test(testcase, val, assertion_func):
     assertion_func(val)
+    expected_shape = _shape(val)
     val_again = pickle_util.roundtrip(val)
-    testcase.assertEqual(_repr_without_address(val),
-                         _repr_without_address(val_again))
+    # (If pickle gave us back the very same object, the shapes match.)
+    if val_again is not val:
+        testcase.assertEqual(expected_shape, _shape(val_again))
     assertion_func(val_again)
 
 
 def _simple_roundtrip_test(testcase, val):
-    def test(val_again):
-        testcase.assertEqual(val, val_again)
+    val_again = pickle_util.roundtrip(val)
+    # We compare reprs rather than the values themselves, since some of them
+    # don't compare equal to their copies (exceptions compare by identity, and
+    # comparing recursive lists or dicts recurses forever).
+    testcase.assertIs(type(val), type(val_again))
+    testcase.assertEqual(_repr_without_address(val),
+                         _repr_without_address(val_again))
+
+
+_BASIC_VALUES = (
+    1, 2 ** 1000, 1.2e34,
+    'str', b'bytes',
+    None, True, NotImplemented, ...,
+    Exception("hello"),
+    object,
+)
 
 
 class TestBuiltins(unittest.TestCase):
     def test_basic(self):
-        for val in [
-                1, 2 ** 1000, 1.2e34,
-                'str', b'bytes',
-                None, True, NotImplemented, ...,
-                Exception("hello"),
-                object,
-        ]:
+        for val in _BASIC_VALUES:
             _simple_roundtrip_test(self, val)
             _simple_roundtrip_test(self, type(val))
 
@@ -89,6 +117,13 @@ def global_annotations(x: int) -> int: return x
 def global_doc():
     """This function has a docstring."""
     pass
+def global_wrapped():
+    """This function is wrapped."""
+    return 1
+@functools.wraps(global_wrapped)
+def global_wrapper(): return global_wrapped()
+def global_renamed(): return 1
+global_renamed.__name__ = global_renamed.__qualname__ = 'renamed'
 
 
 class TestSimpleFunctions(unittest.TestCase):
@@ -175,6 +210,35 @@ class TestSimpleFunctions(unittest.TestCase):
 
         _roundtrip_test(self, global_doc, test)
 
+    def test_unhashable_consts(self):
+        def test(f):
+            self.assertEqual(f(), 1)
+
+        # A list in co_consts makes the code object itself unhashable.
+        def unhashable(): return 1
+        unhashable.__code__ = unhashable.__code__.replace(
+            co_consts=unhashable.__code__.co_consts + ([],))
+        _roundtrip_test(self, unhashable, test)
+
+    def test_renamed(self):
+        # (_roundtrip_test checks that __qualname__ survives.)
+        def test(f):
+            self.assertEqual(f(), 1)
+
+        def wrapped():
+            """This function is wrapped."""
+            return 1
+        @functools.wraps(wrapped)
+        def wrapper(): return wrapped()
+        _roundtrip_test(self, wrapper, test)
+
+        def renamed(): return 1
+        renamed.__name__ = renamed.__qualname__ = 'renamed_again'
+        _roundtrip_test(self, renamed, test)
+
+        _roundtrip_test(self, global_wrapper, test)
+        _roundtrip_test(self, global_renamed, test)
+
 
 def global_factorial(n):
     if n == 0:
@@ -190,12 +254,12 @@ def global_self_attr(n):
     return global_self_attr(0)
 
 
-global_default_g = {}
-global_default_h = {}
-def global_recursive_defaults(g=global_default_g, *, h=global_default_h):
+# (The local variants in test_defaults_lambda use separate dicts for g and h;
+# here we share one, to also test a default shared between the two.)
+global_default_gh = {}
+def global_recursive_defaults(g=global_default_gh, *, h=global_default_gh):
     return (g['f'], h['f'])
-global_default_g['f'] = global_recursive_defaults
-global_default_h['f'] = global_recursive_defaults
+global_default_gh['f'] = global_recursive_defaults
 
 
 def global_recursive_attrs(): pass
@@ -249,8 +313,7 @@ class TestRecursiveFunctions(unittest.TestCase):
         _roundtrip_test(self, self_attr, test)
 
         # just in case...
-        if hasattr(global_self_attr, 'x'):
-            del global_self_attr.x
+        global_self_attr.__dict__.pop('x', None)
 
         _roundtrip_test(self, global_self_attr, test)
 
@@ -352,6 +415,8 @@ class GlobalSlotsClass:
 
 
 class GlobalReduceClass:
+    __slots__ = ('times_pickled',)
+
     def __init__(self):
         self.times_pickled = 0
 
@@ -418,6 +483,8 @@ class TestClasses(unittest.TestCase):
             self.myslot = val
 
     class ClassLevelReduceClass:
+        __slots__ = ('times_pickled',)
+
         def __init__(self):
             self.times_pickled = 0
 
@@ -449,9 +516,13 @@ class TestClasses(unittest.TestCase):
             def method(self):
                 return 3
 
-        _roundtrip_test(self, SimpleLocalClass, test)
-        _roundtrip_test(self, self.SimpleClassLevelClass, test)
-        _roundtrip_test(self, SimpleGlobalClass, test)
+        for cls in [
+                SimpleLocalClass,
+                self.SimpleClassLevelClass,
+                SimpleGlobalClass,
+        ]:
+            with self.subTest(cls=cls):
+                _roundtrip_test(self, cls, test)
 
     def test_methods(self):
         def test(c):
@@ -501,25 +572,30 @@ class TestClasses(unittest.TestCase):
 
             p2 = property(get, set, delete, "A property")
 
-        _roundtrip_test(self, GlobalMethodfulClass, test)
-        _roundtrip_test(self, self.ClassLevelMethodfulClass, test)
-        _roundtrip_test(self, LocalMethodfulClass, test)
+        for cls in [
+                GlobalMethodfulClass,
+                self.ClassLevelMethodfulClass,
+                LocalMethodfulClass,
+        ]:
+            with self.subTest(cls=cls):
+                _roundtrip_test(self, cls, test)
 
     def test_fancy(self):
         def make_test(expected):
             def test(actual):
-                e = expected
-                a = actual
-                for i in itertools.count():
+                # (Only build the message if we need it.)
+                def err(i, e, a):
                     wrapper = "type(" * i + "%s" + ")" * i
-                    err = ("expected %s to be %s, but got %s = %s" % (
+                    return ("expected %s to be %s, but got %s = %s" % (
                         wrapper % expected, e, wrapper % actual, a))
-                    if e is type:
-                        self.assertEqual(a, type, err)
-                        break
-                    self.assertEqual(e.__name__, a.__name__, err)
-                    e = type(e)
-                    a = type(a)
+
+                e, a, i = expected, actual, 0
+                while e is not type:
+                    if e.__name__ != a.__name__:
+                        self.fail(err(i, e, a))
+                    e, a, i = type(e), type(a), i + 1
+                if a != type:
+                    self.fail(err(i, e, a))
             return test
 
         class LocalMetaclass(type): pass
@@ -537,7 +613,8 @@ class TestClasses(unittest.TestCase):
                 LocalBaseClass,
                 LocalFancyClass,
         ]:
-            _roundtrip_test(self, cls, make_test(cls))
+            with self.subTest(cls=cls):
+                _roundtrip_test(self, cls, make_test(cls))
 
     def test_slots(self):
         def testcls(c):
@@ -558,6 +635,19 @@ class TestClasses(unittest.TestCase):
         _roundtrip_test(self, LocalSlotsClass, testcls)
         _roundtrip_test(self, LocalSlotsClass(1), testinst)
 
+    def test_unhashable(self):
+        def test(c):
+            with self.assertRaises(TypeError):
+                hash(c)
+
+        # Defining __eq__ without __hash__ makes the class itself unhashable.
+        class LocalUnhashableMetaclass(type):
+            def __eq__(self, other):
+                return self is other
+        class LocalUnhashableClass(metaclass=LocalUnhashableMetaclass): pass
+
+        _roundtrip_test(self, LocalUnhashableClass, test)
+
     def test_reduce_class(self):
         def test(cls):
             v = cls()
@@ -566,6 +656,8 @@ class TestClasses(unittest.TestCase):
                 v = pickle_util.roundtrip(v)
 
         class LocalReduceClass:
+            __slots__ = ('times_pickled',)
+
             def __init__(self):
                 self.times_pickled = 0
 
@@ -585,7 +677,9 @@ class TestClasses(unittest.TestCase):
 
 class TestModules(unittest.TestCase):
     def test_pickle_function(self):
+        from pickle import loads
+
         def test(mod):
-            self.assertEqual(pickle.loads(mod.dumps(1)), 1)
+            self.assertEqual(loads(mod.dumps(1)), 1)
 
         _roundtrip_test(self, pickle_function, test)
@@ -1,5 +1,6 @@
 #!/usr/bin/env python3
 from pickle import *
+import functools
 import struct
 
 # For explanation, see my blog post:
@@ -74,14 +75,22 @@ def make_pickle(golfed=False):
     If "golfed" is true, we return the minimized version; if false we return
     the one that's easier to understand.
     """
-    part_1 = b''.join(PART_1)
-    part_2 = b''.join(GOLFED_PART_2 if golfed else PART_2)
-    # We tack the length onto part 1:
+    # (There are only the two, so we cache them; we normalize golfed first so
+    # that e.g. make_pickle() and make_pickle(golfed=False) share an entry.)
+    return _make_pickle(bool(golfed))
+
+
+@functools.lru_cache(maxsize=2)
+def _make_pickle(golfed):
+    part_1 = PART_1
+    part_2 = GOLFED_PART_2 if golfed else PART_2
+    # We tack the length onto part 1 (SHORT_BINBYTES takes a one-byte length):
     length = len(part_1) + 1 + len(part_2)
-    part_1 = part_1 + b'%c' % length
-    # Now glue everything together.
-    the_string = part_1 + part_2
-    return part_1 + the_string + part_2
+    assert 0 <= length < 256, length
+    part_1 = part_1 + bytes((length,))
+    # Now glue everything together: part 1, then the string itself (which is
+    # part 1 + part 2), then part 2.
+    return b''.join((part_1, part_1, part_2, part_2))
 
 
 # Now we golf it.  Only part 2 has anything interesting to golf.  Our main
@@ -132,6 +141,13 @@ GOLFED_PART_2 = (
 )
 
 
+# Glue each part together once here, rather than on each call.  (We rebind the
+# names, so the tuples of opcodes above can be freed.)
+PART_1 = b''.join(PART_1)
+PART_2 = b''.join(PART_2)
+GOLFED_PART_2 = b''.join(GOLFED_PART_2)
+
+
 def check_pickle(data):
     """Checks that the input is a pickle-quine."""
     assert data == loads(data)